@@ -3,17 +3,40 @@ Main Pipeline: Feature Engineering - Group 6
 Runs all 5 feature engineering modules in sequence
 """
 
-import pandas as pd
+import argparse
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import pandas as pd
+
+try:
+    import dask
+except ImportError:
+    dask = None
+
 # Import all modules
+from src._dtypes import downcast
+from src._io import read_csv, write_csv
 from src.derive_computed_columns import process_csv as derive_columns
 from src.encode_categorical_features import process_csv as encode_features
 from src.bin_numeric_ranges import process_csv as bin_features
 from src.time_based_feature_extraction import process_csv as extract_time_features
 from src.flag_anomalies_column import process_csv as flag_anomalies
+from src.derive_computed_columns import derive_computed_columns
+from src.encode_categorical_features import encode_categorical_features
+from src.bin_numeric_ranges import bin_numeric_ranges
+from src.time_based_feature_extraction import time_based_feature_extraction
 
+# Intermediate outputs written when run_pipeline is given a format
+STEP_OUTPUTS = [
+    'step1_computed_columns',
+    'step2_encoded_features',
+    'step3_binned_features',
+    'step4_time_features',
+    'step5_anomaly_flags',
+]
 
 def print_header():
     """Print pipeline header"""
@@ -24,7 +47,7 @@ def print_header():
     print("="*70 + "\n")
 
 
-def print_summary(original_df, final_df, start_time):
+def print_summary(original_columns, final_df, start_time):
     """Print pipeline summary"""
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
@@ -33,23 +56,108 @@ def print_summary(original_df, final_df, start_time):
     print("✅ PIPELINE COMPLETED SUCCESSFULLY!")
     print("="*70)
     print(f"\n📊 Summary:")
-    print(f"   Original columns: {original_df.shape[1]}")
+    print(f"   Original columns: {original_columns}")
     print(f"   Final columns: {final_df.shape[1]}")
-    print(f"   New features created: {final_df.shape[1] - original_df.shape[1]}")
+    print(f"   New features created: {final_df.shape[1] - original_columns}")
     print(f"   Total rows: {final_df.shape[0]}")
     print(f"   Duration: {duration:.2f} seconds")
     print(f"\n⏰ Completed at: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*70 + "\n")
 
 
+def run_polars_pipeline(input_csv, output_csv):
+    """
+    Run all 5 modules as a single lazy Polars query (needs `polars` and `pyarrow`)
+    
+    Args:
+        input_csv (str): Path to input CSV file
+        output_csv (str): Path to save final output
+        
+    Returns:
+        tuple: (number of original columns, final pd.DataFrame)
+    """
+    from src.polars_pipeline import run_pipeline as polars_pipeline
+    import polars as pl
+    
+    print(f"📂 Input file: {input_csv}")
+    original_columns = len(pl.scan_csv(input_csv).collect_schema())
+    
+    print("STEP 1/1: Running polars_pipeline (all 5 modules)...")
+    df = polars_pipeline(input_csv)
+    
+    df.write_csv(output_csv)
+    print(f"\n💾 Final output saved: {output_csv}")
+    
+    return original_columns, df.to_pandas()
+
+
+def run_independent_steps(df, verbose=False):
+    """
+    Run steps 1-4 concurrently where they do not depend on each other
+    
+    Steps 2 (categorical) and 4 (time) only read original columns, so step 2
+    runs alongside steps 1 -> 3 (derive, then bin the derived prices) on a
+    thread pool. Uses dask's threaded scheduler when dask is installed. The
+    new columns are joined in the same order as the sequential pipeline.
+    
+    Step 4 stays on the calling thread: its Numba kernel is already parallel,
+    and launching Numba kernels from worker threads as well as the main
+    thread hangs the TBB threading layer at interpreter exit.
+    
+    Args:
+        df (pd.DataFrame): Original dataframe
+        verbose (bool): Print per-module progress messages
+        
+    Returns:
+        pd.DataFrame: Dataframe with the features of steps 1-4
+    """
+    if dask is not None:
+        timed = time_based_feature_extraction(df, verbose=verbose)
+        derived = dask.delayed(derive_computed_columns)(df, verbose=verbose)
+        binned = dask.delayed(bin_numeric_ranges)(derived, verbose=verbose)
+        encoded = dask.delayed(encode_categorical_features)(df, verbose=verbose)
+        derived, binned, encoded = dask.compute(derived, binned, encoded, scheduler='threads')
+    else:
+        def derive_and_bin():
+            derived = derive_computed_columns(df, verbose=verbose)
+            return derived, bin_numeric_ranges(derived, verbose=verbose)
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            encoded = pool.submit(encode_categorical_features, df, verbose=verbose)
+            derived_binned = pool.submit(derive_and_bin)
+            timed = time_based_feature_extraction(df, verbose=verbose)
+            encoded, (derived, binned) = encoded.result(), derived_binned.result()
+    
+    def new_columns(result, base):
+        return result.iloc[:, base.shape[1]:]
+    
+    # The time step also parses the datetime columns in place, so take the
+    # original columns from its output
+    return pd.concat([
+        timed.iloc[:, :df.shape[1]],
+        new_columns(derived, df),
+        new_columns(encoded, df),
+        new_columns(binned, derived),
+        new_columns(timed, df),
+    ], axis=1)
+
+
 def run_pipeline(input_csv='data/raw/sample_data.csv', 
-                 output_csv='data/processed/final_engineered_features.csv'):
+                 output_csv='data/processed/final_engineered_features.csv',
+                 engine='pandas', intermediate_format=None, parallel=False, verbose=None):
     """
     Run the complete feature engineering pipeline
     
     Args:
         input_csv (str): Path to input CSV file
         output_csv (str): Path to save final output
+        engine (str): 'pandas' (default) or 'polars' for the opt-in Polars fast path
+        intermediate_format (str): 'parquet', 'feather' or 'csv' to also save each step's
+            output next to the final file (default: None, not saved)
+        parallel (bool): Run independent steps concurrently (pandas engine only;
+            intermediate outputs are not saved in this mode)
+        verbose (bool): Print each module's progress messages (default: the
+            PIPELINE_VERBOSE environment variable, off when unset)
         
     Returns:
         pd.DataFrame: Final processed dataframe
@@ -57,38 +165,66 @@ def run_pipeline(input_csv='data/raw/sample_data.csv',
     start_time = datetime.now()
     print_header()
     
+    if verbose is None:
+        verbose = os.environ.get('PIPELINE_VERBOSE', '').lower() in ('1', 'true', 'yes')
+    
     try:
-        # Load original data for comparison
-        original_df = pd.read_csv(input_csv)
+        if engine == 'polars':
+            original_columns, df = run_polars_pipeline(input_csv, output_csv)
+            print_summary(original_columns, df, start_time)
+            return df
+        
+        # Load original data once, with numeric columns narrowed to the
+        # smallest dtype that holds them; the modules never modify their input,
+        # so it doubles as the comparison frame for the summary
+        original_df = downcast(read_csv(input_csv))
         print(f"📂 Input file: {input_csv}")
         print(f"📊 Original shape: {original_df.shape}\n")
         
+        if parallel:
+            print("STEPS 1-4/5: Running independent steps concurrently...")
+            df = run_independent_steps(original_df, verbose=verbose)
+            
+            print("\nSTEP 5/5: Running flag_anomalies_column...")
+            df = flag_anomalies(df, verbose=verbose)
+            
+            write_csv(df, output_csv)
+            print(f"\n💾 Final output saved: {output_csv}")
+            print_summary(original_df.shape[1], df, start_time)
+            return df
+        
+        if intermediate_format:
+            output_dir = os.path.dirname(output_csv)
+            step_files = [os.path.join(output_dir, f'{name}.{intermediate_format}') for name in STEP_OUTPUTS]
+        else:
+            step_files = [None] * len(STEP_OUTPUTS)
+        
         # Step 1: Derive Computed Columns
         print("STEP 1/5: Running derive_computed_columns...")
-        df = derive_columns(input_csv)
+        df = derive_columns(original_df, step_files[0], verbose=verbose)
         
         # Step 2: Encode Categorical Features
         print("\nSTEP 2/5: Running encode_categorical_features...")
-        df = encode_features(df)
+        df = encode_features(df, step_files[1], verbose=verbose)
         
         # Step 3: Bin Numeric Ranges
         print("\nSTEP 3/5: Running bin_numeric_ranges...")
-        df = bin_features(df)
+        df = bin_features(df, step_files[2], verbose=verbose)
         
         # Step 4: Extract Time-Based Features
         print("\nSTEP 4/5: Running time_based_feature_extraction...")
-        df = extract_time_features(df)
+        df = extract_time_features(df, step_files[3], verbose=verbose)
         
         # Step 5: Flag Anomalies
         print("\nSTEP 5/5: Running flag_anomalies_column...")
-        df = flag_anomalies(df)
+        df = flag_anomalies(df, step_files[4], verbose=verbose)
         
         # Save final output
-        df.to_csv(output_csv, index=False)
+        write_csv(df, output_csv)
         print(f"\n💾 Final output saved: {output_csv}")
         
         # Print summary
-        print_summary(original_df, df, start_time)
+        print_summary(original_df.shape[1], df, start_time)
         
         return df
         
@@ -120,8 +256,18 @@ def show_sample_output(df, n_rows=5):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feature Engineering Pipeline - Group 6")
+    parser.add_argument('--engine', choices=['pandas', 'polars'], default='pandas',
+                        help="dataframe engine to run the modules on")
+    parser.add_argument('--format', dest='intermediate_format', choices=['parquet', 'feather', 'csv'], default=None,
+                        help="also save each step's output in data/processed/ in this format")
+    parser.add_argument('--parallel', action='store_true',
+                        help="run independent steps concurrently (pandas engine)")
+    args = parser.parse_args()
+    
     # Run the pipeline
-    final_df = run_pipeline()
+    final_df = run_pipeline(engine=args.engine, intermediate_format=args.intermediate_format,
+                            parallel=args.parallel)
     
     # Show sample output
     show_sample_output(final_df)
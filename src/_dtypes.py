@@ -0,0 +1,74 @@
+"""
+Dtype helpers for the Feature Engineering Pipeline
+Stores numeric columns in the narrowest dtype that holds their values, and
+widens them again where a module does arithmetic that could overflow
+"""
+
+import numpy as np
+
+
+_SIGNED = (np.int8, np.int16, np.int32)
+_UNSIGNED = (np.uint8, np.uint16, np.uint32)
+
+
+def _narrowest_int(values):
+    """Return the smallest integer dtype that holds every value, or None"""
+    if values.size == 0:
+        return None
+    lo, hi = values.min(), values.max()
+    for dtype in (_UNSIGNED if values.dtype.kind == 'u' else _SIGNED):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return None
+
+
+def downcast(df):
+    """
+    Downcast numeric columns to the narrowest dtype that keeps every value
+
+    Integers shrink to the smallest width whose np.iinfo bounds cover the
+    column. Floats become float32 only when that is lossless, so values
+    such as prices with two decimals keep full precision.
+
+    Args:
+        df (pd.DataFrame): Input dataframe
+
+    Returns:
+        pd.DataFrame: Dataframe with narrowed numeric columns
+    """
+    new_cols = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if not isinstance(dtype, np.dtype) or dtype.itemsize == 1:
+            continue
+
+        if dtype.kind in 'iu':
+            values = df[col].to_numpy()
+            narrow = _narrowest_int(values)
+            if narrow is not None and np.dtype(narrow).itemsize < dtype.itemsize:
+                new_cols[col] = values.astype(narrow)
+        elif dtype.kind == 'f' and dtype.itemsize > 4:
+            values = df[col].to_numpy()
+            narrow = values.astype(np.float32)
+            if np.array_equal(narrow, values, equal_nan=True):
+                new_cols[col] = narrow
+
+    return df.assign(**new_cols) if new_cols else df
+
+
+def widen(values):
+    """
+    Widen a narrow numeric array to int64/float64 before arithmetic
+
+    Args:
+        values (np.ndarray): Column values
+
+    Returns:
+        np.ndarray: int64 or float64 array (the input itself if already wide)
+    """
+    if values.dtype.kind == 'f':
+        return values.astype(np.float64, copy=False)
+    if values.dtype.kind in 'iu' and values.dtype.itemsize < 8:
+        return values.astype(np.int64)
+    return values
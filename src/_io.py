@@ -0,0 +1,107 @@
+"""
+I/O helpers for the Feature Engineering Pipeline
+Reads and writes CSV files through PyArrow's multithreaded reader and writer,
+and intermediate step outputs as Parquet or Feather
+"""
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from pyarrow import feather
+from pyarrow import parquet as pq
+
+
+def _with_interval_labels(df):
+    """Replace interval categories (pd.cut with a bin count) by their text labels, which Arrow can store"""
+    interval_cols = {
+        col: df[col].cat.rename_categories(str)
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and isinstance(df[col].cat.categories, pd.IntervalIndex)
+    }
+    return df.assign(**interval_cols) if interval_cols else df
+
+
+# Text columns stay Arrow-backed (string[pyarrow]) instead of NumPy object
+# arrays; numeric columns stay NumPy so the array kernels can use them directly
+_ARROW_STRING_TYPES = {
+    pa.string(): pd.StringDtype('pyarrow'),
+    pa.large_string(): pd.StringDtype('pyarrow'),
+}
+
+# Smaller blocks than PyArrow's 1 MB default give the parser threads more
+# batches to share on mid-sized files and keep each batch cache-resident
+_CSV_BLOCK_SIZE = 256 * 1024
+
+
+def _to_pandas(table):
+    """Convert an Arrow table to pandas, keeping text columns Arrow-backed"""
+    return table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=_ARROW_STRING_TYPES.get)
+
+
+def read_csv(path):
+    """
+    Read a CSV file into a dataframe using PyArrow's parallel parser
+
+    Args:
+        path (str): Path to CSV file
+
+    Returns:
+        pd.DataFrame: Loaded dataframe with Arrow-backed string columns
+    """
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=_CSV_BLOCK_SIZE)
+    # Empty text fields become missing values, as with pandas' reader
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+    return _to_pandas(pa_csv.read_csv(path, read_options=read_options, convert_options=convert_options))
+
+
+def write_csv(df, path):
+    """
+    Write a dataframe to CSV using PyArrow's CSV writer
+
+    Args:
+        df (pd.DataFrame): Dataframe to save
+        path (str): Path to output CSV file
+    """
+    table = pa.Table.from_pandas(_with_interval_labels(df), preserve_index=False)
+    pa_csv.write_csv(table, path)
+
+
+def read_table(path):
+    """
+    Read a CSV, Parquet or Feather file, chosen by file extension
+
+    All go through PyArrow, so text columns come back as string[pyarrow]
+    and timestamp columns as datetime64 either way.
+
+    Args:
+        path (str): Path to .csv, .parquet or .feather file
+
+    Returns:
+        pd.DataFrame: Loaded dataframe
+    """
+    if str(path).endswith('.parquet'):
+        return _to_pandas(pq.read_table(path))
+    if str(path).endswith('.feather'):
+        return _to_pandas(feather.read_table(path))
+    return read_csv(path)
+
+
+def write_table(df, path):
+    """
+    Write a dataframe as CSV, or Zstd-compressed Parquet/Feather, chosen by file extension
+
+    Parquet and Feather keep dtypes (including categoricals from binning,
+    which are stored dictionary-encoded) between pipeline steps, so nothing
+    is re-parsed from text.
+
+    Args:
+        df (pd.DataFrame): Dataframe to save
+        path (str): Path to .csv, .parquet or .feather file
+    """
+    if str(path).endswith('.parquet'):
+        _with_interval_labels(df).to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+    elif str(path).endswith('.feather'):
+        table = pa.Table.from_pandas(_with_interval_labels(df), preserve_index=False)
+        feather.write_feather(table, path, compression='zstd')
+    else:
+        write_csv(df, path)
@@ -0,0 +1,103 @@
+"""
+Numba kernel for Module 4: Time-Based Feature Extraction
+Computes all calendar fields of a datetime column in one compiled pass
+
+`numba` is optional; when it is missing NUMBA_AVAILABLE is False and
+time_based_feature_extraction falls back to its NumPy implementation.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+
+def _long_iso_year(y):
+    """1 when year y has 53 ISO weeks, else 0"""
+    p = (y + y // 4 - y // 100 + y // 400) % 7
+    q = (y - 1 + (y - 1) // 4 - (y - 1) // 100 + (y - 1) // 400) % 7
+    return 1 if p == 4 or q == 3 else 0
+
+
+def _calendar_fields(days, nat, days_in_month, season_codes):
+    """
+    Split days since 1970-01-01 into calendar fields and flags
+
+    Args:
+        days (np.ndarray): int64 days since 1970-01-01
+        nat (np.ndarray): Boolean mask of missing dates
+        days_in_month (np.ndarray): Days in each month of a non-leap year
+        season_codes (np.ndarray): Season category code per month number
+
+    Returns:
+        tuple: year (int16), month, day, day of week (0=Monday), quarter,
+            ISO week, is_weekend, is_month_start, is_month_end and season
+            code (int8). Missing dates hold 0, and -1 for the season code
+    """
+    n = days.size
+    year = np.zeros(n, dtype=np.int16)
+    month = np.zeros(n, dtype=np.int8)
+    day = np.zeros(n, dtype=np.int8)
+    dow = np.zeros(n, dtype=np.int8)
+    quarter = np.zeros(n, dtype=np.int8)
+    week = np.zeros(n, dtype=np.int8)
+    is_weekend = np.zeros(n, dtype=np.int8)
+    is_month_start = np.zeros(n, dtype=np.int8)
+    is_month_end = np.zeros(n, dtype=np.int8)
+    season = np.full(n, -1, dtype=np.int8)
+
+    for i in prange(n):
+        if nat[i]:
+            continue
+        d = days[i]
+
+        # Howard Hinnant's civil_from_days
+        z = d + 719468
+        era = z // 146097
+        doe = z - era * 146097
+        yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+        doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+        mp = (5 * doy + 2) // 153
+        dd = doy - (153 * mp + 2) // 5 + 1
+        mm = mp + 3 if mp < 10 else mp - 9
+        yy = yoe + era * 400 + (1 if mm <= 2 else 0)
+
+        wd = (d + 3) % 7  # 1970-01-01 was a Thursday
+        leap = (yy % 4 == 0 and yy % 100 != 0) or yy % 400 == 0
+        last_day = days_in_month[mm - 1] + (1 if mm == 2 and leap else 0)
+
+        # ISO week: count weeks from January 1st (days_from_civil), then move
+        # dates before week 1 or after the year's last week across the boundary
+        y = yy - 1
+        y_era = y // 400
+        y_oe = y - y_era * 400
+        jan_first = y_era * 146097 + 365 * y_oe + y_oe // 4 - y_oe // 100 + 306 - 719468
+        wk = (d - jan_first - wd + 10) // 7
+        if wk < 1:
+            wk = 52 + _long_iso_year(yy - 1)
+        elif wk > 52 + _long_iso_year(yy):
+            wk = 1
+
+        year[i] = yy
+        month[i] = mm
+        day[i] = dd
+        dow[i] = wd
+        quarter[i] = (mm - 1) // 3 + 1
+        week[i] = wk
+        is_weekend[i] = wd >= 5
+        is_month_start[i] = dd == 1
+        is_month_end[i] = dd == last_day
+        season[i] = season_codes[mm]
+
+    return year, month, day, dow, quarter, week, is_weekend, is_month_start, is_month_end, season
+
+
+if NUMBA_AVAILABLE:
+    _long_iso_year = njit(nogil=True, cache=True)(_long_iso_year)
+    calendar_fields = njit(parallel=True, nogil=True, cache=True)(_calendar_fields)
+else:
+    calendar_fields = None
@@ -6,116 +6,165 @@ Groups continuous numerical variables into discrete bins/categories
 import pandas as pd
 import numpy as np
 
+from ._io import read_table, write_table
 
-def bin_numeric_ranges(df):
+
+def _make_binner(bins, labels, include_lowest=False):
+    """
+    Build a binning function with its edges and labels fixed once at import
+    
+    The returned function is equivalent to pd.cut(arr, bins, labels) with
+    right-closed intervals, without rebuilding the bins on every call.
+    
+    Args:
+        bins (tuple): Monotonically increasing bin edges
+        labels (tuple): One label per bin
+        include_lowest (bool): Whether the first interval includes its left edge
+        
+    Returns:
+        function: Maps an array of values to an ordered pd.Categorical of
+            bin labels (NaN outside the edges)
+    """
+    edges = np.asarray(bins, dtype=np.float64)
+    dtype = pd.CategoricalDtype(list(labels), ordered=True)
+    n_bins = len(labels)
+    
+    def binner(arr):
+        codes = np.searchsorted(edges, arr, side='left') - 1
+        if include_lowest:
+            codes[arr == edges[0]] = 0
+        codes[(codes < 0) | (codes >= n_bins)] = -1
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+    
+    return binner
+
+
+# Fixed bin edges and labels
+_AGE_BINS = (0, 25, 35, 50, 65, 100)
+_AGE_LABELS = ('18-25', '26-35', '36-50', '51-65', '65+')
+
+_INCOME_BINS = (0, 30000, 50000, 75000, 100000, np.inf)
+_INCOME_LABELS = ('Low', 'Lower-Middle', 'Middle', 'Upper-Middle', 'High')
+
+_PURCHASE_BINS = (0, 100, 500, 1000, 2000, np.inf)
+_PURCHASE_LABELS = ('Very Low', 'Low', 'Medium', 'High', 'Very High')
+
+_RATING_BINS = (0, 2, 3, 4, 5)
+_RATING_LABELS = ('Poor', 'Fair', 'Good', 'Excellent')
+
+_DISCOUNT_BINS = (0, 10, 25, 40, 100)
+_DISCOUNT_LABELS = ('No Discount', 'Low Discount', 'Medium Discount', 'High Discount')
+
+_QUARTILE_DTYPE = pd.CategoricalDtype(['Q1', 'Q2', 'Q3', 'Q4'], ordered=True)
+
+_bin_age = _make_binner(_AGE_BINS, _AGE_LABELS, include_lowest=True)
+_bin_income = _make_binner(_INCOME_BINS, _INCOME_LABELS)
+_bin_purchase = _make_binner(_PURCHASE_BINS, _PURCHASE_LABELS)
+_bin_rating = _make_binner(_RATING_BINS, _RATING_LABELS, include_lowest=True)
+_bin_discount = _make_binner(_DISCOUNT_BINS, _DISCOUNT_LABELS, include_lowest=True)
+
+
+def bin_numeric_ranges(df, verbose=True):
     """
     Create binned versions of numeric columns
     
     Args:
         df (pd.DataFrame): Input dataframe
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Dataframe with binned numeric features
     """
-    df_new = df.copy()
+    new_cols = {}
     
     # 1. Bin Age into groups
-    if 'age' in df_new.columns:
-        bins = [0, 25, 35, 50, 65, 100]
-        labels = ['18-25', '26-35', '36-50', '51-65', '65+']
-        df_new['age_group'] = pd.cut(df_new['age'], bins=bins, labels=labels, include_lowest=True)
-        print(f"✅ Created: age_group")
-        print(f"   Bins: {labels}")
+    if 'age' in df.columns:
+        new_cols['age_group'] = _bin_age(df['age'].to_numpy())
     
     # 2. Bin Income into brackets
-    if 'income' in df_new.columns:
-        bins = [0, 30000, 50000, 75000, 100000, np.inf]
-        labels = ['Low', 'Lower-Middle', 'Middle', 'Upper-Middle', 'High']
-        df_new['income_bracket'] = pd.cut(df_new['income'], bins=bins, labels=labels)
-        print(f"✅ Created: income_bracket")
-        print(f"   Bins: {labels}")
+    if 'income' in df.columns:
+        new_cols['income_bracket'] = _bin_income(df['income'].to_numpy())
     
     # 3. Bin Purchase Amount
-    if 'purchase_amount' in df_new.columns:
-        bins = [0, 100, 500, 1000, 2000, np.inf]
-        labels = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
-        df_new['purchase_category'] = pd.cut(df_new['purchase_amount'], bins=bins, labels=labels)
-        print(f"✅ Created: purchase_category")
-        print(f"   Bins: {labels}")
+    if 'purchase_amount' in df.columns:
+        new_cols['purchase_category'] = _bin_purchase(df['purchase_amount'].to_numpy())
     
     # 4. Bin Rating
-    if 'rating' in df_new.columns:
-        bins = [0, 2, 3, 4, 5]
-        labels = ['Poor', 'Fair', 'Good', 'Excellent']
-        df_new['rating_category'] = pd.cut(df_new['rating'], bins=bins, labels=labels, include_lowest=True)
-        print(f"✅ Created: rating_category")
-        print(f"   Bins: {labels}")
+    if 'rating' in df.columns:
+        new_cols['rating_category'] = _bin_rating(df['rating'].to_numpy())
     
     # 5. Bin Discount Percentage
-    if 'discount_percent' in df_new.columns:
-        bins = [0, 10, 25, 40, 100]
-        labels = ['No Discount', 'Low Discount', 'Medium Discount', 'High Discount']
-        df_new['discount_tier'] = pd.cut(df_new['discount_percent'], bins=bins, labels=labels, include_lowest=True)
-        print(f"✅ Created: discount_tier")
-        print(f"   Bins: {labels}")
+    if 'discount_percent' in df.columns:
+        new_cols['discount_tier'] = _bin_discount(df['discount_percent'].to_numpy())
     
     # 6. Quantile-based binning for custom columns
-    if 'final_price' in df_new.columns:
-        df_new['price_quartile'] = pd.qcut(df_new['final_price'], q=4, labels=['Q1', 'Q2', 'Q3', 'Q4'], duplicates='drop')
-        print(f"✅ Created: price_quartile (quantile-based)")
+    if 'final_price' in df.columns:
+        # Only the three interior edges are needed: the lowest and highest
+        # prices fall into Q1 and Q4 anyway, so no full min/max pass or sort
+        prices = df['final_price'].to_numpy(dtype=np.float64)
+        edges = np.nanquantile(prices, [0.25, 0.5, 0.75], method='linear')
+        codes = np.searchsorted(edges, prices, side='left')
+        codes[np.isnan(prices)] = -1
+        new_cols['price_quartile'] = pd.Categorical.from_codes(codes, dtype=_QUARTILE_DTYPE)
     
     # 7. Equal-width binning example
-    if 'income_purchase_ratio' in df_new.columns:
+    if 'income_purchase_ratio' in df.columns:
         bins = 5  # Number of bins
-        df_new['spending_ratio_bin'] = pd.cut(df_new['income_purchase_ratio'], bins=bins)
-        print(f"✅ Created: spending_ratio_bin (equal-width, {bins} bins)")
+        new_cols['spending_ratio_bin'] = pd.cut(df['income_purchase_ratio'], bins=bins)
+    
+    if verbose:
+        for col, binned in new_cols.items():
+            print(f"✅ Created: {col}")
+            print(f"   Bins: {list(binned.dtype.categories)}")
     
-    return df_new
+    return df.assign(**new_cols)
 
 
-def process_csv(input_file, output_file=None):
+def process_csv(input_file, output_file=None, verbose=True):
     """
     Process CSV file and bin numeric ranges
     
     Args:
-        input_file (str or pd.DataFrame): Path to input CSV file or DataFrame
-        output_file (str): Path to output CSV file (optional)
+        input_file (str or pd.DataFrame): Path to input CSV/Parquet/Feather file or DataFrame
+        output_file (str): Path to output CSV/Parquet/Feather file (optional)
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Processed dataframe
     """
-    print("\n" + "="*60)
-    print("📊 MODULE 3: BIN NUMERIC RANGES")
-    print("="*60)
+    log = print if verbose else (lambda *args: None)
+    log("\n" + "="*60)
+    log("📊 MODULE 3: BIN NUMERIC RANGES")
+    log("="*60)
     
     # Load data
     if isinstance(input_file, str):
-        df = pd.read_csv(input_file)
-        print(f"\n📂 Loaded: {input_file}")
+        df = read_table(input_file)
+        log(f"\n📂 Loaded: {input_file}")
     else:
-        df = input_file.copy()
-        print(f"\n📂 Loaded DataFrame from previous step")
+        df = input_file
+        log(f"\n📂 Loaded DataFrame from previous step")
     
-    print(f"📊 Original shape: {df.shape}")
+    log(f"📊 Original shape: {df.shape}")
     
     # Apply feature engineering
-    df_processed = bin_numeric_ranges(df)
+    df_processed = bin_numeric_ranges(df, verbose=verbose)
     
-    print(f"\n📊 New shape: {df_processed.shape}")
-    print(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
+    log(f"\n📊 New shape: {df_processed.shape}")
+    log(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
     
     # Save if output path provided
     if output_file:
-        df_processed.to_csv(output_file, index=False)
-        print(f"\n💾 Saved: {output_file}")
+        write_table(df_processed, output_file)
+        log(f"\n💾 Saved: {output_file}")
     
     return df_processed
 
 
 if __name__ == "__main__":
     # Test the module
-    df = process_csv('data/processed/step2_encoded_features.csv',
-                     'data/processed/step3_binned_features.csv')
+    df = process_csv('data/processed/step2_encoded_features.parquet',
+                     'data/processed/step3_binned_features.parquet')
     print("\n🔍 Sample of binned columns:")
     binned_cols = ['age', 'age_group', 'income', 'income_bracket', 'purchase_amount', 'purchase_category']
     available_cols = [col for col in binned_cols if col in df.columns]
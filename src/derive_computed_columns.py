@@ -3,91 +3,107 @@ Feature Engineering Module 1: Derive Computed Columns
 Creates new columns based on mathematical operations on existing columns
 """
 
-import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from ._dtypes import widen
+from ._io import read_table, write_table
 
-def derive_computed_columns(df):
+
+def derive_computed_columns(df, verbose=True):
     """
     Derive new columns through computations on existing columns
     
     Args:
         df (pd.DataFrame): Input dataframe
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Dataframe with new computed columns
     """
-    df_new = df.copy()
+    # Pull the input columns out as plain arrays once; everything below
+    # works on ndarrays and rounds in place to avoid intermediate Series.
+    # Downcast columns are widened first so e.g. age ** 2 cannot overflow int8
+    source_cols = ['purchase_amount', 'shipping_cost', 'discount_percent', 'income', 'age', 'rating']
+    arr = {col: widen(df[col].to_numpy()) for col in source_cols if col in df.columns}
+    new_cols = {}
     
     # 1. Calculate total cost (purchase + shipping)
-    if 'purchase_amount' in df_new.columns and 'shipping_cost' in df_new.columns:
-        df_new['total_cost'] = df_new['purchase_amount'] + df_new['shipping_cost']
-        print("✅ Created: total_cost")
+    if 'purchase_amount' in arr and 'shipping_cost' in arr:
+        new_cols['total_cost'] = arr['purchase_amount'] + arr['shipping_cost']
     
     # 2. Calculate discount amount
-    if 'purchase_amount' in df_new.columns and 'discount_percent' in df_new.columns:
-        df_new['discount_amount'] = (df_new['purchase_amount'] * df_new['discount_percent'] / 100).round(2)
-        print("✅ Created: discount_amount")
+    if 'purchase_amount' in arr and 'discount_percent' in arr:
+        discount_amount = arr['purchase_amount'] * arr['discount_percent'] / 100
+        new_cols['discount_amount'] = np.round(discount_amount, 2, out=discount_amount)
     
     # 3. Calculate final price after discount
-    if 'total_cost' in df_new.columns and 'discount_amount' in df_new.columns:
-        df_new['final_price'] = (df_new['total_cost'] - df_new['discount_amount']).round(2)
-        print("✅ Created: final_price")
+    if 'total_cost' in new_cols and 'discount_amount' in new_cols:
+        final_price = new_cols['total_cost'] - new_cols['discount_amount']
+        new_cols['final_price'] = np.round(final_price, 2, out=final_price)
     
     # 4. Calculate price per rating point
-    if 'final_price' in df_new.columns and 'rating' in df_new.columns:
-        df_new['price_per_rating'] = (df_new['final_price'] / df_new['rating']).round(2)
-        print("✅ Created: price_per_rating")
+    if 'final_price' in new_cols and 'rating' in arr:
+        price_per_rating = new_cols['final_price'] / arr['rating']
+        new_cols['price_per_rating'] = np.round(price_per_rating, 2, out=price_per_rating)
     
     # 5. Calculate income to purchase ratio
-    if 'income' in df_new.columns and 'purchase_amount' in df_new.columns:
-        df_new['income_purchase_ratio'] = (df_new['purchase_amount'] / df_new['income'] * 100).round(2)
-        print("✅ Created: income_purchase_ratio")
+    if 'income' in arr and 'purchase_amount' in arr:
+        ratio = arr['purchase_amount'] / arr['income'] * 100
+        new_cols['income_purchase_ratio'] = np.round(ratio, 2, out=ratio)
     
     # 6. Calculate age groups
-    if 'age' in df_new.columns:
-        df_new['age_squared'] = df_new['age'] ** 2
-        print("✅ Created: age_squared")
+    if 'age' in arr:
+        new_cols['age_squared'] = arr['age'] ** 2
     
     # 7. Calculate spending power index (normalized)
-    if 'income' in df_new.columns and 'age' in df_new.columns:
-        df_new['spending_power_index'] = ((df_new['income'] / 1000) / df_new['age']).round(2)
-        print("✅ Created: spending_power_index")
+    if 'income' in arr and 'age' in arr:
+        spending_power = arr['income'] / 1000 / arr['age']
+        new_cols['spending_power_index'] = np.round(spending_power, 2, out=spending_power)
+    
+    if verbose:
+        for col in new_cols:
+            print(f"✅ Created: {col}")
     
-    return df_new
+    return df.assign(**new_cols)
 
 
-def process_csv(input_file, output_file=None):
+def process_csv(input_file, output_file=None, verbose=True):
     """
     Process CSV file and derive computed columns
     
     Args:
-        input_file (str): Path to input CSV file
-        output_file (str): Path to output CSV file (optional)
+        input_file (str or pd.DataFrame): Path to input CSV/Parquet/Feather file or DataFrame
+        output_file (str): Path to output CSV/Parquet/Feather file (optional)
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Processed dataframe
     """
-    print("\n" + "="*60)
-    print("🔧 MODULE 1: DERIVE COMPUTED COLUMNS")
-    print("="*60)
+    log = print if verbose else (lambda *args: None)
+    log("\n" + "="*60)
+    log("🔧 MODULE 1: DERIVE COMPUTED COLUMNS")
+    log("="*60)
     
     # Load data
-    df = pd.read_csv(input_file)
-    print(f"\n📂 Loaded: {input_file}")
-    print(f"📊 Original shape: {df.shape}")
+    if isinstance(input_file, str):
+        df = read_table(input_file)
+        log(f"\n📂 Loaded: {input_file}")
+    else:
+        df = input_file
+        log(f"\n📂 Loaded DataFrame")
+    log(f"📊 Original shape: {df.shape}")
     
     # Apply feature engineering
-    df_processed = derive_computed_columns(df)
+    df_processed = derive_computed_columns(df, verbose=verbose)
     
-    print(f"\n📊 New shape: {df_processed.shape}")
-    print(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
+    log(f"\n📊 New shape: {df_processed.shape}")
+    log(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
     
     # Save if output path provided
     if output_file:
-        df_processed.to_csv(output_file, index=False)
-        print(f"\n💾 Saved: {output_file}")
+        write_table(df_processed, output_file)
+        log(f"\n💾 Saved: {output_file}")
     
     return df_processed
 
@@ -95,7 +111,7 @@ def process_csv(input_file, output_file=None):
 if __name__ == "__main__":
     # Test the module
     df = process_csv('data/raw/sample_data.csv', 
-                     'data/processed/step1_computed_columns.csv')
+                     'data/processed/step1_computed_columns.parquet')
     print("\n🔍 Sample of new columns:")
     print(df[['purchase_amount', 'shipping_cost', 'total_cost', 
               'discount_amount', 'final_price']].head())
\ No newline at end of file
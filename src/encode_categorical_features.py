@@ -7,116 +7,193 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder, OneHotEncoder
 
+from ._io import read_table, write_table
 
-def encode_categorical_features(df):
+
+# One-hot lookup tables keyed by (column, categories), reused across calls
+_ENCODER_CACHE = {}
+
+
+def _onehot_table(col, unique_vals):
+    """
+    Get the one-hot lookup table and dummy column names for a column
+    
+    Args:
+        col (str): Column name
+        unique_vals (pd.Index): Categories of the column
+        
+    Returns:
+        tuple: (int8 lookup matrix, list of dummy column names)
+    """
+    key = (col, tuple(unique_vals))
+    if key not in _ENCODER_CACHE:
+        # Identity rows plus an all-zero row, picked up by missing values (code -1)
+        table = np.eye(len(unique_vals) + 1, len(unique_vals), dtype=np.int8)
+        _ENCODER_CACHE[key] = (table, [f'{col}_{v}' for v in unique_vals])
+    return _ENCODER_CACHE[key]
+
+
+def clear_encoder_cache():
+    """Drop all cached one-hot lookup tables"""
+    _ENCODER_CACHE.clear()
+
+
+def _freq_encode(values):
+    """
+    Replace each value by its relative frequency among non-missing values
+    
+    Args:
+        values (pd.Series): Categorical column
+        
+    Returns:
+        np.ndarray: Frequencies rounded to 4 decimals (NaN for missing values)
+    """
+    # pd.factorize dispatches to Arrow's hash kernel for string[pyarrow]
+    # columns (across all chunks) and to pandas' hash table otherwise
+    codes, unique_vals = pd.factorize(values)
+    n_unique = len(unique_vals)
+    
+    # Shift codes by one so missing values (code -1) land in slot 0, then
+    # gather each row's frequency from the per-category table
+    counts = np.bincount(codes + 1, minlength=n_unique + 1)
+    freq = counts[1:] / max(len(codes) - counts[0], 1)
+    return np.append(np.nan, freq.round(4))[codes + 1]
+
+
+def _looks_like_datetime(sample):
+    """
+    Check whether a small sample of a column parses as datetimes
+    
+    Args:
+        sample (pd.Series): First few values of the column
+        
+    Returns:
+        bool: True if every non-null value in the sample is a datetime
+    """
+    sample = sample.dropna()
+    if sample.empty:
+        return False
+    try:
+        pd.to_datetime(sample, errors='raise')
+        return True
+    except (ValueError, TypeError, OverflowError):
+        return False
+
+
+def encode_categorical_features(df, datetime_columns=None, verbose=True):
     """
     Encode categorical columns into numerical format
     
     Args:
         df (pd.DataFrame): Input dataframe
+        datetime_columns (list): Text columns holding dates, skipped from encoding
+            (optional; detected from the first rows when not given)
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Dataframe with encoded categorical features
     """
-    df_new = df.copy()
+    log = print if verbose else (lambda *args: None)
+    new_cols = {}
     
     # Identify categorical columns
-    categorical_cols = df_new.select_dtypes(include=['object']).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'string']).columns.tolist()
     
     # Exclude datetime columns if any
-    datetime_cols = []
-    for col in categorical_cols:
-        try:
-            pd.to_datetime(df_new[col])
-            datetime_cols.append(col)
-        except:
-            pass
+    if datetime_columns is None:
+        datetime_cols = [col for col in categorical_cols if _looks_like_datetime(df[col].iloc[:10])]
+    else:
+        datetime_cols = list(datetime_columns)
     
     categorical_cols = [col for col in categorical_cols if col not in datetime_cols]
     
-    print(f"\n🔍 Found {len(categorical_cols)} categorical columns: {categorical_cols}")
+    log(f"\n🔍 Found {len(categorical_cols)} categorical columns: {categorical_cols}")
     
     # 1. Label Encoding for ordinal features
     ordinal_features = ['education']
     
     for col in ordinal_features:
-        if col in df_new.columns:
+        if col in df.columns:
             # Define order
             if col == 'education':
                 order = ['High School', 'Bachelor', 'Master', 'PhD']
-                df_new[f'{col}_encoded'] = df_new[col].map({v: i for i, v in enumerate(order)})
-                print(f"✅ Label encoded: {col} → {col}_encoded")
+                # Values outside the order (or missing) are encoded as -1
+                new_cols[f'{col}_encoded'] = pd.Categorical(df[col], categories=order, ordered=True).codes.astype(np.int8)
+                log(f"✅ Label encoded: {col} → {col}_encoded")
     
     # 2. One-Hot Encoding for nominal features
     nominal_features = ['gender', 'product_category']
     
     for col in nominal_features:
-        if col in df_new.columns:
-            # Get unique values
-            unique_vals = df_new[col].unique()
-            print(f"✅ One-hot encoding: {col} ({len(unique_vals)} categories)")
+        if col in df.columns:
+            # Factorize once to get unique values and per-row codes
+            codes, unique_vals = pd.factorize(df[col], sort=True)
+            log(f"✅ One-hot encoding: {col} ({len(unique_vals)} categories)")
             
-            # Create dummy variables
-            dummies = pd.get_dummies(df_new[col], prefix=col, drop_first=False)
-            df_new = pd.concat([df_new, dummies], axis=1)
+            # Create dummy variables by gathering rows of the (cached) lookup table
+            table, dummy_cols = _onehot_table(col, unique_vals)
+            dummies = pd.DataFrame(table[codes], columns=dummy_cols, index=df.index)
+            new_cols.update(dummies.items())
             
-            print(f"   Created columns: {', '.join(dummies.columns.tolist())}")
+            log(f"   Created columns: {', '.join(dummies.columns.tolist())}")
     
     # 3. Frequency Encoding (for high-cardinality features)
     # This encodes based on how frequent each category appears
     for col in categorical_cols:
         if col not in ordinal_features + nominal_features:
-            if col in df_new.columns:
-                freq = df_new[col].value_counts(normalize=True)
-                df_new[f'{col}_freq'] = df_new[col].map(freq).round(4)
-                print(f"✅ Frequency encoded: {col} → {col}_freq")
+            if col in df.columns:
+                new_cols[f'{col}_freq'] = _freq_encode(df[col])
+                log(f"✅ Frequency encoded: {col} → {col}_freq")
     
-    return df_new
+    return df.assign(**new_cols)
 
 
-def process_csv(input_file, output_file=None):
+def process_csv(input_file, output_file=None, datetime_columns=None, verbose=True):
     """
     Process CSV file and encode categorical features
     
     Args:
-        input_file (str or pd.DataFrame): Path to input CSV file or DataFrame
-        output_file (str): Path to output CSV file (optional)
+        input_file (str or pd.DataFrame): Path to input CSV/Parquet/Feather file or DataFrame
+        output_file (str): Path to output CSV/Parquet/Feather file (optional)
+        datetime_columns (list): Text columns holding dates (optional)
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Processed dataframe
     """
-    print("\n" + "="*60)
-    print("🏷️  MODULE 2: ENCODE CATEGORICAL FEATURES")
-    print("="*60)
+    log = print if verbose else (lambda *args: None)
+    log("\n" + "="*60)
+    log("🏷️  MODULE 2: ENCODE CATEGORICAL FEATURES")
+    log("="*60)
     
     # Load data
     if isinstance(input_file, str):
-        df = pd.read_csv(input_file)
-        print(f"\n📂 Loaded: {input_file}")
+        df = read_table(input_file)
+        log(f"\n📂 Loaded: {input_file}")
     else:
-        df = input_file.copy()
-        print(f"\n📂 Loaded DataFrame from previous step")
+        df = input_file
+        log(f"\n📂 Loaded DataFrame from previous step")
     
-    print(f"📊 Original shape: {df.shape}")
+    log(f"📊 Original shape: {df.shape}")
     
     # Apply feature engineering
-    df_processed = encode_categorical_features(df)
+    df_processed = encode_categorical_features(df, datetime_columns=datetime_columns, verbose=verbose)
     
-    print(f"\n📊 New shape: {df_processed.shape}")
-    print(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
+    log(f"\n📊 New shape: {df_processed.shape}")
+    log(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
     
     # Save if output path provided
     if output_file:
-        df_processed.to_csv(output_file, index=False)
-        print(f"\n💾 Saved: {output_file}")
+        write_table(df_processed, output_file)
+        log(f"\n💾 Saved: {output_file}")
     
     return df_processed
 
 
 if __name__ == "__main__":
     # Test the module
-    df = process_csv('data/processed/step1_computed_columns.csv',
-                     'data/processed/step2_encoded_features.csv')
+    df = process_csv('data/processed/step1_computed_columns.parquet',
+                     'data/processed/step2_encoded_features.parquet')
     print("\n🔍 Sample of encoded columns:")
     encoded_cols = [col for col in df.columns if '_encoded' in col or 'gender_' in col or 'product_category_' in col]
     print(df[encoded_cols[:5]].head())
\ No newline at end of file
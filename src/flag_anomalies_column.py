@@ -5,7 +5,9 @@ Detects and flags outliers/anomalies in numerical columns
 
 import pandas as pd
 import numpy as np
-from scipy import stats
+
+from ._anomaly_numba import NUMBA_AVAILABLE, flag_all
+from ._io import read_table, write_table
 
 
 def flag_anomalies_zscore(df, column, threshold=3):
@@ -20,10 +22,10 @@ def flag_anomalies_zscore(df, column, threshold=3):
     Returns:
         pd.Series: Binary flags (1 = anomaly, 0 = normal)
     """
-    z_scores = np.abs(stats.zscore(df[column].dropna()))
-    flags = pd.Series(0, index=df.index)
-    flags.loc[df[column].notna()] = (z_scores > threshold).astype(int)
-    return flags
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_scores = np.abs((values - np.nanmean(values)) / np.nanstd(values))
+    return pd.Series((z_scores > threshold).astype(np.int8), index=df.index, copy=False)
 
 
 def flag_anomalies_iqr(df, column, multiplier=1.5):
@@ -38,15 +40,15 @@ def flag_anomalies_iqr(df, column, multiplier=1.5):
     Returns:
         pd.Series: Binary flags (1 = anomaly, 0 = normal)
     """
-    Q1 = df[column].quantile(0.25)
-    Q3 = df[column].quantile(0.75)
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    Q1, Q3 = np.nanpercentile(values, [25, 75])
     IQR = Q3 - Q1
     
     lower_bound = Q1 - multiplier * IQR
     upper_bound = Q3 + multiplier * IQR
     
-    flags = ((df[column] < lower_bound) | (df[column] > upper_bound)).astype(int)
-    return flags
+    flags = ((values < lower_bound) | (values > upper_bound)).astype(np.int8)
+    return pd.Series(flags, index=df.index, copy=False)
 
 
 def flag_anomalies_percentile(df, column, lower=1, upper=99):
@@ -62,27 +64,26 @@ def flag_anomalies_percentile(df, column, lower=1, upper=99):
     Returns:
         pd.Series: Binary flags (1 = anomaly, 0 = normal)
     """
-    lower_bound = df[column].quantile(lower / 100)
-    upper_bound = df[column].quantile(upper / 100)
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    lower_bound, upper_bound = np.nanpercentile(values, [lower, upper])
     
-    flags = ((df[column] < lower_bound) | (df[column] > upper_bound)).astype(int)
-    return flags
+    flags = ((values < lower_bound) | (values > upper_bound)).astype(np.int8)
+    return pd.Series(flags, index=df.index, copy=False)
 
 
-def flag_anomalies_column(df):
+def flag_anomalies_column(df, verbose=True):
     """
     Flag anomalies in multiple numerical columns using various methods
     
     Args:
         df (pd.DataFrame): Input dataframe
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Dataframe with anomaly flag columns
     """
-    df_new = df.copy()
-    
     # Select numeric columns to check for anomalies
-    numeric_cols = df_new.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
     # Exclude ID columns and already flagged columns
     exclude = ['customer_id', 'id']
@@ -91,8 +92,6 @@ def flag_anomalies_column(df):
     numeric_cols = [col for col in numeric_cols if not col.startswith('gender_')]
     numeric_cols = [col for col in numeric_cols if not col.startswith('product_category_')]
     
-    print(f"\n🔍 Checking {len(numeric_cols)} numeric columns for anomalies")
-    
     # Key columns to flag
     priority_cols = ['income', 'purchase_amount', 'final_price', 'age']
     cols_to_check = [col for col in priority_cols if col in numeric_cols]
@@ -101,92 +100,106 @@ def flag_anomalies_column(df):
     other_cols = [col for col in numeric_cols if col not in priority_cols][:6]
     cols_to_check.extend(other_cols)
     
-    print(f"📌 Flagging anomalies in: {cols_to_check}\n")
-    
-    anomaly_count = {}
-    
-    for col in cols_to_check:
-        if col in df_new.columns:
+    # All flags live in one int8 buffer, three columns per checked column
+    # (Z-score, IQR, combined), column-major so each flag column is contiguous
+    if NUMBA_AVAILABLE and cols_to_check:
+        # All columns in one compiled pass (column-major so each column is contiguous)
+        X = np.asfortranarray(df[cols_to_check].to_numpy(dtype=np.float64, na_value=np.nan))
+        flag_matrix, scores = flag_all(X, 3.0, 1.5)
+    else:
+        flag_matrix = np.zeros((len(df), 3 * len(cols_to_check)), dtype=np.int8, order='F')
+        for i, col in enumerate(cols_to_check):
             # Method 1: Z-score (for normally distributed data)
-            df_new[f'{col}_anomaly_zscore'] = flag_anomalies_zscore(df_new, col, threshold=3)
-            z_count = df_new[f'{col}_anomaly_zscore'].sum()
+            z_flags = flag_anomalies_zscore(df, col, threshold=3).to_numpy()
             
             # Method 2: IQR (robust to outliers)
-            df_new[f'{col}_anomaly_iqr'] = flag_anomalies_iqr(df_new, col, multiplier=1.5)
-            iqr_count = df_new[f'{col}_anomaly_iqr'].sum()
+            iqr_flags = flag_anomalies_iqr(df, col, multiplier=1.5).to_numpy()
             
             # Method 3: Combined flag (anomaly in either method)
-            df_new[f'{col}_is_anomaly'] = (
-                (df_new[f'{col}_anomaly_zscore'] == 1) | 
-                (df_new[f'{col}_anomaly_iqr'] == 1)
-            ).astype(int)
-            combined_count = df_new[f'{col}_is_anomaly'].sum()
-            
-            anomaly_count[col] = combined_count
-            
+            flag_matrix[:, 3 * i] = z_flags
+            flag_matrix[:, 3 * i + 1] = iqr_flags
+            np.bitwise_or(z_flags, iqr_flags, out=flag_matrix[:, 3 * i + 2])
+        
+        # Create an overall anomaly score (how many columns have anomalies)
+        scores = flag_matrix[:, 2::3].sum(axis=1, dtype=np.int16)
+    
+    flag_names = [f'{col}_{suffix}' for col in cols_to_check
+                  for suffix in ('anomaly_zscore', 'anomaly_iqr', 'is_anomaly')]
+    flag_df = pd.DataFrame(flag_matrix, columns=flag_names, index=df.index, copy=False)
+    score_df = pd.DataFrame({
+        'anomaly_score': scores,
+        'has_any_anomaly': (scores > 0).astype(np.int8),
+    }, index=df.index)
+    
+    if verbose:
+        print(f"\n🔍 Checking {len(numeric_cols)} numeric columns for anomalies")
+        print(f"📌 Flagging anomalies in: {cols_to_check}\n")
+        
+        # One reduction over the flag buffer gives every count
+        totals = flag_matrix.sum(axis=0).reshape(-1, 3)
+        for col, (z_total, iqr_total, combined_total) in zip(cols_to_check, totals):
             print(f"✅ {col}:")
-            print(f"   Z-score anomalies: {z_count}")
-            print(f"   IQR anomalies: {iqr_count}")
-            print(f"   Combined anomalies: {combined_count}")
-    
-    # Create an overall anomaly score (how many columns have anomalies)
-    anomaly_cols = [col for col in df_new.columns if col.endswith('_is_anomaly')]
-    df_new['anomaly_score'] = df_new[anomaly_cols].sum(axis=1)
-    df_new['has_any_anomaly'] = (df_new['anomaly_score'] > 0).astype(int)
-    
-    print(f"\n✨ Created overall anomaly indicators:")
-    print(f"   - anomaly_score: Total anomalies per row")
-    print(f"   - has_any_anomaly: Binary flag for any anomaly")
-    
-    total_with_anomalies = df_new['has_any_anomaly'].sum()
-    print(f"\n📊 Total rows with at least one anomaly: {total_with_anomalies} ({total_with_anomalies/len(df_new)*100:.1f}%)")
+            print(f"   Z-score anomalies: {z_total}")
+            print(f"   IQR anomalies: {iqr_total}")
+            print(f"   Combined anomalies: {combined_total}")
+        
+        print(f"\n✨ Created overall anomaly indicators:")
+        print(f"   - anomaly_score: Total anomalies per row")
+        print(f"   - has_any_anomaly: Binary flag for any anomaly")
+        
+        total_with_anomalies = np.count_nonzero(scores)
+        print(f"\n📊 Total rows with at least one anomaly: {total_with_anomalies} ({total_with_anomalies/len(df)*100:.1f}%)")
     
-    return df_new
+    # Join everything in one step; flags from an earlier run are replaced
+    previous = df.columns.intersection(flag_names + list(score_df.columns))
+    return pd.concat([df.drop(columns=previous), flag_df, score_df], axis=1)
 
 
-def process_csv(input_file, output_file=None):
+def process_csv(input_file, output_file=None, verbose=True):
     """
     Process CSV file and flag anomalies
     
     Args:
-        input_file (str or pd.DataFrame): Path to input CSV file or DataFrame
-        output_file (str): Path to output CSV file (optional)
+        input_file (str or pd.DataFrame): Path to input CSV/Parquet/Feather file or DataFrame
+        output_file (str): Path to output CSV/Parquet/Feather file (optional)
+        verbose (bool): Print progress messages (default: True)
         
     Returns:
         pd.DataFrame: Processed dataframe
     """
-    print("\n" + "="*60)
-    print("🚩 MODULE 5: FLAG ANOMALIES COLUMN")
-    print("="*60)
+    log = print if verbose else (lambda *args: None)
+    log("\n" + "="*60)
+    log("🚩 MODULE 5: FLAG ANOMALIES COLUMN")
+    log("="*60)
     
     # Load data
     if isinstance(input_file, str):
-        df = pd.read_csv(input_file)
-        print(f"\n📂 Loaded: {input_file}")
+        df = read_table(input_file)
+        log(f"\n📂 Loaded: {input_file}")
     else:
-        df = input_file.copy()
-        print(f"\n📂 Loaded DataFrame from previous step")
+        df = input_file
+        log(f"\n📂 Loaded DataFrame from previous step")
     
-    print(f"📊 Original shape: {df.shape}")
+    log(f"📊 Original shape: {df.shape}")
     
     # Apply feature engineering
-    df_processed = flag_anomalies_column(df)
+    df_processed = flag_anomalies_column(df, verbose=verbose)
     
-    print(f"\n📊 New shape: {df_processed.shape}")
-    print(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
+    log(f"\n📊 New shape: {df_processed.shape}")
+    log(f"✨ Added {df_processed.shape[1] - df.shape[1]} new columns")
     
     # Save if output path provided
     if output_file:
-        df_processed.to_csv(output_file, index=False)
-        print(f"\n💾 Saved: {output_file}")
+        write_table(df_processed, output_file)
+        log(f"\n💾 Saved: {output_file}")
     
     return df_processed
 
 
 if __name__ == "__main__":
     # Test the module
-    df = process_csv('data/processed/step4_time_features.csv',
-                     'data/processed/step5_anomaly_flags.csv')
+    df = process_csv('data/processed/step4_time_features.parquet',
+                     'data/processed/step5_anomaly_flags.parquet')
     print("\n🔍 Sample of anomaly flags:")
     anomaly_cols = ['income', 'income_is_anomaly', 'purchase_amount', 'purchase_amount_is_anomaly', 'anomaly_score']
     available_cols = [col for col in anomaly_cols if col in df.columns]
@@ -0,0 +1,348 @@
+"""
+Polars Pipeline: Feature Engineering - Group 6
+Expresses all 5 feature engineering modules as a single lazy Polars query
+
+This is an opt-in fast path (run_pipeline(engine='polars') in main.py) and
+needs the optional `polars` package. It produces the same feature columns as
+the pandas modules, with two differences: spending_ratio_bin holds the
+equal-width bin number (0-4) instead of an interval label, and one-hot
+columns are added after the query is collected because their names depend
+on the data.
+"""
+
+from datetime import datetime
+
+import polars as pl
+
+from .bin_numeric_ranges import (
+    _AGE_BINS, _AGE_LABELS, _DISCOUNT_BINS, _DISCOUNT_LABELS, _INCOME_BINS, _INCOME_LABELS,
+    _PURCHASE_BINS, _PURCHASE_LABELS, _RATING_BINS, _RATING_LABELS,
+)
+
+
+def derive_computed_columns(lf):
+    """
+    Derive new columns through computations on existing columns
+
+    Args:
+        lf (pl.LazyFrame): Input lazy frame
+
+    Returns:
+        pl.LazyFrame: Lazy frame with new computed columns
+    """
+    cols = set(lf.collect_schema().names())
+    purchase, shipping, discount = pl.col('purchase_amount'), pl.col('shipping_cost'), pl.col('discount_percent')
+    income, age, rating = pl.col('income'), pl.col('age'), pl.col('rating')
+
+    if {'purchase_amount', 'shipping_cost'} <= cols:
+        lf = lf.with_columns((purchase + shipping).alias('total_cost'))
+    if {'purchase_amount', 'discount_percent'} <= cols:
+        lf = lf.with_columns((purchase * discount / 100).round(2).alias('discount_amount'))
+    if {'total_cost', 'discount_amount'} <= set(lf.collect_schema().names()):
+        lf = lf.with_columns((pl.col('total_cost') - pl.col('discount_amount')).round(2).alias('final_price'))
+        if 'rating' in cols:
+            lf = lf.with_columns((pl.col('final_price') / rating).round(2).alias('price_per_rating'))
+    if {'income', 'purchase_amount'} <= cols:
+        lf = lf.with_columns((purchase / income * 100).round(2).alias('income_purchase_ratio'))
+    if 'age' in cols:
+        lf = lf.with_columns((age ** 2).alias('age_squared'))
+    if {'income', 'age'} <= cols:
+        lf = lf.with_columns((income / 1000 / age).round(2).alias('spending_power_index'))
+
+    return lf
+
+
+def encode_categorical_features(lf):
+    """
+    Encode ordinal and high-cardinality categorical columns
+
+    One-hot encoding of nominal columns happens in one_hot_encode, after
+    the query has been collected.
+
+    Args:
+        lf (pl.LazyFrame): Input lazy frame
+
+    Returns:
+        pl.LazyFrame: Lazy frame with encoded categorical features
+    """
+    schema = lf.collect_schema()
+    categorical_cols = [col for col, dtype in schema.items() if dtype == pl.String]
+    # Text dates are left for time_based_feature_extraction, as in the pandas
+    # module: columns whose first 10 values parse as dates are skipped
+    formats = _date_formats(lf, categorical_cols, n_rows=10)
+    categorical_cols = [col for col in categorical_cols if formats[col] is None]
+    ordinal_features = ['education']
+    nominal_features = ['gender', 'product_category']
+
+    exprs = []
+    if 'education' in schema:
+        order = ['High School', 'Bachelor', 'Master', 'PhD']
+        exprs.append(
+            pl.col('education').replace_strict(order, list(range(len(order))), default=-1, return_dtype=pl.Int8)
+            .alias('education_encoded')
+        )
+
+    for col in categorical_cols:
+        if col not in ordinal_features + nominal_features:
+            freq = pl.len().over(col) / pl.col(col).count()
+            exprs.append(pl.when(pl.col(col).is_not_null()).then(freq.round(4)).alias(f'{col}_freq'))
+
+    return lf.with_columns(exprs)
+
+
+def one_hot_encode(df, columns=('gender', 'product_category')):
+    """
+    One-hot encode nominal columns of a collected frame
+
+    Dummy columns are inserted right after the ordinal encoding so the column
+    order matches the pandas pipeline.
+
+    Args:
+        df (pl.DataFrame): Collected dataframe
+        columns (tuple): Nominal columns to encode
+
+    Returns:
+        pl.DataFrame: Dataframe with int8 dummy columns
+    """
+    columns = [col for col in columns if col in df.columns]
+    if not columns:
+        return df
+
+    dummies = df.select(columns).to_dummies(separator='_', drop_nulls=True).cast(pl.Int8)
+    position = df.get_column_index('education_encoded') + 1 if 'education_encoded' in df.columns else df.width
+    for offset, dummy in enumerate(dummies.iter_columns()):
+        df = df.insert_column(position + offset, dummy)
+    return df
+
+
+def _bin(value, edges, labels):
+    """Label each value with the first right-closed bin whose upper edge it does not exceed"""
+    expr = pl.when(value <= edges[0]).then(pl.lit(labels[0]))
+    for edge, label in zip(edges[1:], labels[1:]):
+        expr = expr.when(value <= edge).then(pl.lit(label))
+    return expr.otherwise(pl.lit(labels[-1])).cast(pl.Enum(labels))
+
+
+def _cut(col, bins, labels, include_lowest=False):
+    """Right-closed binning that leaves values outside the edges null, like pd.cut"""
+    lower = pl.col(col) >= bins[0] if include_lowest else pl.col(col) > bins[0]
+    in_range = lower & (pl.col(col) <= bins[-1])
+    return pl.when(in_range).then(_bin(pl.col(col), list(bins[1:-1]), list(labels)))
+
+
+def _qcut(col, quantiles, labels):
+    """Quantile binning with linearly interpolated edges, like pd.qcut"""
+    edges = [pl.col(col).quantile(q, interpolation='linear') for q in quantiles]
+    return pl.when(pl.col(col).is_not_null()).then(_bin(pl.col(col), edges, list(labels)))
+
+
+def bin_numeric_ranges(lf):
+    """
+    Create binned versions of numeric columns
+
+    Args:
+        lf (pl.LazyFrame): Input lazy frame
+
+    Returns:
+        pl.LazyFrame: Lazy frame with binned numeric features
+    """
+    cols = set(lf.collect_schema().names())
+
+    exprs = []
+    if 'age' in cols:
+        exprs.append(_cut('age', _AGE_BINS, _AGE_LABELS, include_lowest=True).alias('age_group'))
+    if 'income' in cols:
+        exprs.append(_cut('income', _INCOME_BINS, _INCOME_LABELS).alias('income_bracket'))
+    if 'purchase_amount' in cols:
+        exprs.append(_cut('purchase_amount', _PURCHASE_BINS, _PURCHASE_LABELS).alias('purchase_category'))
+    if 'rating' in cols:
+        exprs.append(_cut('rating', _RATING_BINS, _RATING_LABELS, include_lowest=True).alias('rating_category'))
+    if 'discount_percent' in cols:
+        exprs.append(_cut('discount_percent', _DISCOUNT_BINS, _DISCOUNT_LABELS,
+                          include_lowest=True).alias('discount_tier'))
+    if 'final_price' in cols:
+        exprs.append(_qcut('final_price', [0.25, 0.5, 0.75], ['Q1', 'Q2', 'Q3', 'Q4']).alias('price_quartile'))
+    if 'income_purchase_ratio' in cols:
+        ratio = pl.col('income_purchase_ratio')
+        width = (ratio.max() - ratio.min()) / 5
+        exprs.append(((ratio - ratio.min()) / width).ceil().clip(1, 5).sub(1).cast(pl.Int8)
+                     .alias('spending_ratio_bin'))
+
+    return lf.with_columns(exprs)
+
+
+# Text date layouts, tried as whole groups: ISO 8601 (what the pipeline
+# writes) first, then month-first as pandas infers, then day-first
+_DATE_FORMATS = (
+    ('%Y-%m-%d %H:%M:%S%.f', '%Y-%m-%dT%H:%M:%S%.f', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d'),
+    ('%m/%d/%Y %H:%M:%S%.f', '%m/%d/%Y %H:%M', '%m/%d/%Y'),
+    ('%d/%m/%Y %H:%M:%S%.f', '%d/%m/%Y %H:%M', '%d/%m/%Y'),
+)
+
+
+def _parse_dates(col, formats):
+    """Parse a text column with the first of several layouts that matches each value"""
+    return pl.coalesce([pl.col(col).str.to_datetime(fmt, time_unit='us', strict=False) for fmt in formats]).alias(col)
+
+
+def _date_formats(lf, columns, n_rows=None):
+    """
+    Find the date layout group that reads every non-null value of each text column
+
+    Args:
+        lf (pl.LazyFrame): Input lazy frame
+        columns (list): Text columns to check
+        n_rows (int): Only check the first rows (optional)
+
+    Returns:
+        dict: Column -> layout group from _DATE_FORMATS, or None when no group
+            reads the whole column (or it is empty)
+    """
+    if not columns:
+        return {}
+    sample = lf.head(n_rows) if n_rows else lf
+    checks = [
+        ((_parse_dates(col, group).null_count() == pl.col(col).null_count()) & pl.col(col).is_not_null().any())
+        .alias(f'{i}_{col}')
+        for col in columns for i, group in enumerate(_DATE_FORMATS)
+    ]
+    complete = iter(sample.select(checks).collect().row(0))
+    found = {}
+    for col in columns:
+        matches = [group for group in _DATE_FORMATS if next(complete)]
+        found[col] = matches[0] if matches else None
+    return found
+
+
+def time_based_feature_extraction(lf, today=None, datetime_columns=None):
+    """
+    Extract time-based features from datetime columns
+
+    Args:
+        lf (pl.LazyFrame): Input lazy frame
+        today (datetime): Reference time for relative features (default: now)
+        datetime_columns (list): Columns to extract features from (optional;
+            detected from dtypes and column names when not given)
+
+    Returns:
+        pl.LazyFrame: Lazy frame with extracted time features
+    """
+    schema = lf.collect_schema()
+    today = today or datetime.now()
+    if datetime_columns is None:
+        # Same rule as the pandas module: Datetime/Date columns, plus text
+        # columns named like dates
+        candidates = [col for col, dtype in schema.items()
+                      if dtype in (pl.Datetime, pl.Date)
+                      or (dtype == pl.String and ('date' in col.lower() or 'time' in col.lower()))]
+    else:
+        candidates = list(datetime_columns)
+
+    # Parse text columns with the first layout that reads all of their values;
+    # columns no layout reads completely stay text and get no features
+    formats = _date_formats(lf, [col for col in candidates if schema[col] == pl.String])
+    datetime_cols = [col for col in candidates if schema[col] != pl.String or formats[col] is not None]
+    parse = [_parse_dates(col, formats[col]) for col in datetime_cols if schema[col] == pl.String]
+    if parse:
+        lf = lf.with_columns(parse)
+
+    seasons = {12: 'Winter', 1: 'Winter', 2: 'Winter', 3: 'Spring', 4: 'Spring', 5: 'Spring',
+               6: 'Summer', 7: 'Summer', 8: 'Summer', 9: 'Fall', 10: 'Fall', 11: 'Fall'}
+
+    # Flags are 0 for missing dates, as in the pandas module
+    exprs = []
+    for col in datetime_cols:
+        dt = pl.col(col).dt
+        # Whole days rounded down, like pandas' Timedelta.days: calendar-day
+        # difference, minus one when the time of day is later than today's
+        # (Date columns have no time of day)
+        days_from_today = (pl.lit(today.date()) - dt.date()).dt.total_days()
+        if schema[col] != pl.Date:
+            days_from_today = days_from_today - (dt.time() > pl.lit(today.time())).cast(pl.Int64)
+        exprs.extend([
+            dt.year().alias(f'{col}_year'),
+            dt.month().alias(f'{col}_month'),
+            dt.strftime('%B').alias(f'{col}_month_name'),
+            dt.day().alias(f'{col}_day'),
+            (dt.weekday() - 1).alias(f'{col}_day_of_week'),
+            dt.strftime('%A').alias(f'{col}_day_name'),
+            dt.quarter().alias(f'{col}_quarter'),
+            dt.week().alias(f'{col}_week_of_year'),
+            (dt.weekday() >= 6).cast(pl.Int8).fill_null(0).alias(f'{col}_is_weekend'),
+            (dt.day() == 1).cast(pl.Int8).fill_null(0).alias(f'{col}_is_month_start'),
+            (dt.day() == dt.month_end().dt.day()).cast(pl.Int8).fill_null(0).alias(f'{col}_is_month_end'),
+            dt.epoch('d').alias(f'{col}_days_since_epoch'),
+            dt.month().replace_strict(seasons, return_dtype=pl.String).alias(f'{col}_season'),
+            days_from_today.alias(f'{col}_days_from_today'),
+            (days_from_today <= 30).cast(pl.Int8).fill_null(0).alias(f'{col}_is_recent'),
+        ])
+
+    return lf.with_columns(exprs)
+
+
+def flag_anomalies_column(lf, threshold=3, multiplier=1.5):
+    """
+    Flag anomalies in multiple numerical columns using Z-score and IQR
+
+    Args:
+        lf (pl.LazyFrame): Input lazy frame
+        threshold (float): Z-score threshold (default: 3)
+        multiplier (float): IQR multiplier (default: 1.5)
+
+    Returns:
+        pl.LazyFrame: Lazy frame with anomaly flag columns
+    """
+    schema = lf.collect_schema()
+    numeric_cols = [col for col, dtype in schema.items() if dtype.is_numeric()]
+
+    # Same column selection as the pandas module
+    exclude = ['customer_id', 'id']
+    numeric_cols = [col for col in numeric_cols if not any(ex in col.lower() for ex in exclude)]
+    numeric_cols = [col for col in numeric_cols if not col.endswith('_encoded')]
+    numeric_cols = [col for col in numeric_cols if not col.startswith(('gender_', 'product_category_'))]
+
+    priority_cols = ['income', 'purchase_amount', 'final_price', 'age']
+    cols_to_check = [col for col in priority_cols if col in numeric_cols]
+    cols_to_check.extend([col for col in numeric_cols if col not in priority_cols][:6])
+
+    exprs = []
+    for col in cols_to_check:
+        c = pl.col(col)
+        z_flag = (((c - c.mean()) / c.std(ddof=0)).abs() > threshold).fill_null(False)
+        q1, q3 = c.quantile(0.25, 'linear'), c.quantile(0.75, 'linear')
+        iqr = q3 - q1
+        iqr_flag = ((c < q1 - multiplier * iqr) | (c > q3 + multiplier * iqr)).fill_null(False)
+        exprs.extend([
+            z_flag.cast(pl.Int8).alias(f'{col}_anomaly_zscore'),
+            iqr_flag.cast(pl.Int8).alias(f'{col}_anomaly_iqr'),
+            (z_flag | iqr_flag).cast(pl.Int8).alias(f'{col}_is_anomaly'),
+        ])
+    lf = lf.with_columns(exprs)
+
+    anomaly_cols = [f'{col}_is_anomaly' for col in cols_to_check]
+    score = pl.sum_horizontal(anomaly_cols) if anomaly_cols else pl.lit(0)
+    return lf.with_columns(score.cast(pl.Int16).alias('anomaly_score')).with_columns(
+        (pl.col('anomaly_score') > 0).cast(pl.Int8).alias('has_any_anomaly')
+    )
+
+
+def run_pipeline(input_csv, streaming=False):
+    """
+    Run all 5 feature engineering modules as one Polars query
+
+    Args:
+        input_csv (str): Path to input CSV file
+        streaming (bool): Use the streaming engine for inputs larger than memory
+
+    Returns:
+        pl.DataFrame: Final processed dataframe
+    """
+    lf = pl.scan_csv(input_csv, try_parse_dates=True)
+    lf = derive_computed_columns(lf)
+    lf = encode_categorical_features(lf)
+    lf = bin_numeric_ranges(lf)
+    lf = time_based_feature_extraction(lf)
+    lf = flag_anomalies_column(lf)
+
+    df = lf.collect(engine='streaming' if streaming else 'auto')
+    return one_hot_encode(df)
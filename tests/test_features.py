@@ -77,6 +77,40 @@ class TestEncodeCategoricalFeatures:
         assert edu_map['Master'] > edu_map['Bachelor']
         assert edu_map['Bachelor'] > edu_map['High School']
 
+    def test_frequency_encoding(self, sample_df):
+        sample_df['city'] = ['Manila', 'Cebu', 'Manila', 'Davao', 'Manila']
+        result = encode_categorical_features(sample_df)
+        assert result['city_freq'].tolist() == [0.6, 0.2, 0.6, 0.2, 0.6]
+
+    def test_frequency_encoding_arrow_matches_object(self, sample_df):
+        city = ['Manila', None, 'Manila', 'Davao', 'Cebu']
+        arrow = encode_categorical_features(sample_df.assign(city=pd.array(city, dtype='string[pyarrow]')))
+        plain = encode_categorical_features(sample_df.assign(city=pd.Series(city, dtype=object)))
+        assert np.array_equal(arrow['city_freq'], plain['city_freq'], equal_nan=True)
+        assert np.isnan(arrow['city_freq'].iloc[1])
+
+    def test_frequency_encoding_chunked_arrow(self, sample_df):
+        import pyarrow as pa
+        chunks = pa.chunked_array([['Manila', 'Cebu'], ['Manila', None], ['Manila']])
+        result = encode_categorical_features(sample_df.assign(city=pd.array(chunks, dtype='string[pyarrow]')))
+        assert np.array_equal(result['city_freq'], [0.75, 0.25, 0.75, np.nan, 0.75], equal_nan=True)
+
+    def test_blank_csv_cell_is_missing(self, sample_df, tmp_path):
+        from src._io import read_csv
+        csv_path = tmp_path / 'blank.csv'
+        sample_df.assign(gender=['Male', '', 'Male', 'Other', 'Female']).to_csv(csv_path, index=False)
+        result = encode_categorical_features(read_csv(str(csv_path)))
+        assert sorted(col for col in result.columns if col.startswith('gender_')) == \
+            ['gender_Female', 'gender_Male', 'gender_Other']
+        assert result.loc[1, ['gender_Female', 'gender_Male', 'gender_Other']].sum() == 0
+
+    def test_text_dates_not_encoded(self, sample_df):
+        sample_df['signup_date'] = ['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01', '2024-05-01']
+        detected = encode_categorical_features(sample_df)
+        explicit = encode_categorical_features(sample_df, datetime_columns=['signup_date'])
+        assert 'signup_date_freq' not in detected.columns
+        assert 'signup_date_freq' not in explicit.columns
+
     def test_creates_gender_onehot(self, sample_df):
         result = encode_categorical_features(sample_df)
         assert 'gender_Male' in result.columns
@@ -90,6 +124,32 @@ class TestEncodeCategoricalFeatures:
         result = encode_categorical_features(sample_df)
         assert set(result['gender_Male'].unique()).issubset({0, 1})
 
+    def test_onehot_one_category_per_row(self, sample_df):
+        result = encode_categorical_features(sample_df)
+        gender_cols = ['gender_Female', 'gender_Male', 'gender_Other']
+        assert (result[gender_cols].sum(axis=1) == 1).all()
+        assert (result[gender_cols].dtypes == np.int8).all()
+
+    def test_arrow_string_columns(self, sample_df):
+        text_cols = ['gender', 'education', 'product_category']
+        arrow_df = sample_df.astype({col: pd.StringDtype('pyarrow') for col in text_cols})
+        result = encode_categorical_features(arrow_df)
+        expected = encode_categorical_features(sample_df)
+        assert result['education_encoded'].tolist() == expected['education_encoded'].tolist()
+        assert result['gender_Male'].tolist() == expected['gender_Male'].tolist()
+
+    def test_onehot_table_cached_across_calls(self, sample_df):
+        module = sys.modules['src.encode_categorical_features']
+        module.clear_encoder_cache()
+        first = encode_categorical_features(sample_df)
+        cached = dict(module._ENCODER_CACHE)
+        second = encode_categorical_features(sample_df)
+        assert len(cached) == 2
+        assert all(module._ENCODER_CACHE[key] is value for key, value in cached.items())
+        assert first.equals(second)
+        module.clear_encoder_cache()
+        assert not module._ENCODER_CACHE
+
     def test_no_rows_lost(self, sample_df):
         result = encode_categorical_features(sample_df)
         assert len(result) == len(sample_df)
@@ -122,6 +182,32 @@ class TestBinNumericRanges:
         result = bin_numeric_ranges(sample_df)
         assert 'discount_tier' in result.columns
 
+    def test_bin_edges_are_right_inclusive(self, sample_df):
+        result = bin_numeric_ranges(sample_df)
+        assert result['age_group'].iloc[1] == '26-35'
+        assert result['income_bracket'].iloc[0] == 'Low'
+        assert result['discount_tier'].iloc[4] == 'No Discount'
+
+    def test_price_quartile_matches_qcut(self, sample_df):
+        df = derive_computed_columns(sample_df)
+        result = bin_numeric_ranges(df)
+        expected = pd.qcut(df['final_price'], q=4, labels=['Q1', 'Q2', 'Q3', 'Q4'])
+        assert list(result['price_quartile']) == list(expected)
+
+    def test_polars_bins_match_pandas(self, sample_df):
+        pl = pytest.importorskip('polars')
+        from src.polars_pipeline import bin_numeric_ranges as polars_bins
+        import warnings
+        df = derive_computed_columns(sample_df)
+        df.loc[2, 'final_price'] = np.nan
+        expected = bin_numeric_ranges(df)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            result = polars_bins(pl.from_pandas(df).lazy()).collect()
+        for column in ['age_group', 'income_bracket', 'purchase_category', 'rating_category', 'discount_tier',
+                       'price_quartile']:
+            pd.testing.assert_series_equal(result[column].to_pandas().astype(str), expected[column].astype(str))
+
     def test_no_rows_lost(self, sample_df):
         result = bin_numeric_ranges(sample_df)
         assert len(result) == len(sample_df)
@@ -148,6 +234,11 @@ class TestTimeBasedFeatureExtraction:
         result = time_based_feature_extraction(sample_df)
         assert set(result['purchase_date_is_weekend'].unique()).issubset({0, 1})
 
+    def test_is_weekend_matches_day_of_week(self, sample_df):
+        result = time_based_feature_extraction(sample_df)
+        weekend = result['purchase_date_day_of_week'].isin([5, 6]).astype(np.int8)
+        assert result['purchase_date_is_weekend'].tolist() == weekend.tolist()
+
     def test_creates_season(self, sample_df):
         result = time_based_feature_extraction(sample_df)
         assert 'purchase_date_season' in result.columns
@@ -161,6 +252,163 @@ class TestTimeBasedFeatureExtraction:
         result = time_based_feature_extraction(sample_df)
         assert 'purchase_date_quarter' in result.columns
 
+    def test_calendar_fields_match_dt_accessor(self):
+        dates = pd.Series(pd.to_datetime(['1969-12-31 23:00', '2000-02-29', '2023-12-31', '2024-03-01',
+                                          '2100-03-01', '2021-01-03', '2020-12-31', '2024-12-30', None],
+                                         format='ISO8601'))
+        result = time_based_feature_extraction(pd.DataFrame({'purchase_date': dates}))
+        for feature, expected in [('year', dates.dt.year), ('month', dates.dt.month), ('day', dates.dt.day),
+                                  ('day_of_week', dates.dt.dayofweek), ('quarter', dates.dt.quarter),
+                                  ('week_of_year', dates.dt.isocalendar().week)]:
+            assert np.allclose(result[f'purchase_date_{feature}'].astype(float), expected.astype(float),
+                               equal_nan=True)
+
+    def test_day_counts_match_timedelta_days(self):
+        dates = pd.Series(pd.to_datetime(['1969-12-31 23:00', '2024-03-01 18:30', None], format='ISO8601'))
+        before = pd.Timestamp.now()
+        result = time_based_feature_extraction(pd.DataFrame({'purchase_date': dates}))
+        since_epoch = (dates - pd.Timestamp('1970-01-01')).dt.days
+        assert np.allclose(result['purchase_date_days_since_epoch'], since_epoch, equal_nan=True)
+        from_today = (before - dates).dt.days
+        assert np.allclose(result['purchase_date_days_from_today'], from_today, equal_nan=True, atol=1)
+        assert result['purchase_date_is_recent'].tolist() == [0, 0, 0]
+
+    def test_is_recent_flags_last_30_days(self):
+        now = pd.Timestamp.now()
+        dates = pd.Series([now - pd.Timedelta(days=3), now - pd.Timedelta(days=90), pd.NaT])
+        result = time_based_feature_extraction(pd.DataFrame({'purchase_date': dates}))
+        assert result['purchase_date_is_recent'].tolist() == [1, 0, 0]
+        assert result['purchase_date_is_recent'].dtype == np.int8
+
+    def test_non_date_text_column_skipped(self, sample_df):
+        sample_df['timezone'] = ['UTC', 'PST', 'UTC', 'EST', 'CET']
+        result = time_based_feature_extraction(sample_df)
+        assert 'timezone_year' not in result.columns
+        assert result['timezone'].tolist() == sample_df['timezone'].tolist()
+
+    def test_does_not_modify_input(self, sample_df):
+        sample_df['purchase_date'] = sample_df['purchase_date'].dt.strftime('%Y-%m-%d')
+        original = sample_df.copy()
+        result = time_based_feature_extraction(sample_df)
+        pd.testing.assert_frame_equal(sample_df, original)
+        assert pd.api.types.is_datetime64_any_dtype(result['purchase_date'])
+
+    def test_arrow_timestamp_column(self, sample_df):
+        import pyarrow as pa
+        arrow_df = sample_df.astype({'purchase_date': pd.ArrowDtype(pa.timestamp('ns'))})
+        result = time_based_feature_extraction(arrow_df)
+        expected = time_based_feature_extraction(sample_df)
+        for feature in ['year', 'month', 'day', 'day_of_week', 'week_of_year', 'season', 'is_month_end']:
+            column = f'purchase_date_{feature}'
+            assert result[column].tolist() == expected[column].tolist()
+
+    @pytest.mark.parametrize('date_type', ['date32', 'date64'])
+    def test_arrow_date_column(self, sample_df, date_type):
+        import pyarrow as pa
+        sample_df.loc[2, 'purchase_date'] = pd.NaT
+        dates = pa.array(sample_df['purchase_date']).cast(getattr(pa, date_type)())
+        arrow_df = sample_df.assign(purchase_date=pd.Series(dates, dtype=pd.ArrowDtype(dates.type)))
+        result = time_based_feature_extraction(arrow_df)
+        expected = time_based_feature_extraction(sample_df)
+        for feature in ['year', 'month', 'day', 'day_of_week', 'week_of_year', 'days_since_epoch',
+                        'days_from_today', 'is_recent']:
+            column = f'purchase_date_{feature}'
+            pd.testing.assert_series_equal(result[column], expected[column])
+
+    def test_numba_and_numpy_paths_agree(self, sample_df, monkeypatch):
+        module = sys.modules['src.time_based_feature_extraction']
+        sample_df.loc[2, 'purchase_date'] = pd.NaT
+        result = time_based_feature_extraction(sample_df)
+        monkeypatch.setattr(module, 'NUMBA_AVAILABLE', False)
+        fallback = time_based_feature_extraction(sample_df)
+        pd.testing.assert_frame_equal(result, fallback)
+
+    def test_multiple_datetime_columns(self, sample_df, monkeypatch):
+        module = sys.modules['src.time_based_feature_extraction']
+        monkeypatch.setattr(module, 'NUMBA_AVAILABLE', False)
+        sample_df['signup_date'] = sample_df['purchase_date'] - pd.Timedelta(days=400)
+        result = time_based_feature_extraction(sample_df)
+        alone = time_based_feature_extraction(sample_df[['signup_date']])
+        for column in ['signup_date_year', 'signup_date_week_of_year', 'signup_date_season']:
+            assert result[column].tolist() == alone[column].tolist()
+        assert result.columns.tolist()[-15] == 'signup_date_year'
+
+    def test_explicit_datetime_columns_match_detection(self, sample_df):
+        detected = time_based_feature_extraction(sample_df)
+        explicit = time_based_feature_extraction(sample_df, datetime_columns=['purchase_date'])
+        pd.testing.assert_frame_equal(explicit.drop(columns='purchase_date_days_from_today'),
+                                      detected.drop(columns='purchase_date_days_from_today'))
+
+    def test_explicit_datetime_columns_parse_text(self, sample_df):
+        sample_df['purchase_date'] = sample_df['purchase_date'].dt.strftime('%Y-%m-%d')
+        sample_df['signup_date'] = sample_df['purchase_date']
+        result = time_based_feature_extraction(sample_df, datetime_columns=['purchase_date'])
+        assert pd.api.types.is_datetime64_any_dtype(result['purchase_date'])
+        assert result['purchase_date_year'].tolist() == [2024, 2024, 2024, 2023, 2024]
+        assert 'signup_date_year' not in result.columns
+
+    def test_polars_engine_matches_pandas(self, sample_df):
+        pytest.importorskip('polars')
+        sample_df.index = sample_df.index + 10
+        sample_df.loc[11, 'purchase_date'] = pd.Timestamp.now().normalize() + pd.Timedelta(days=5, hours=23)
+        expected = time_based_feature_extraction(sample_df)
+        result = time_based_feature_extraction(sample_df, engine='polars')
+        assert result.columns.tolist() == expected.columns.tolist()
+        assert result.index.equals(expected.index)
+        for feature in ['year', 'month', 'day_of_week', 'week_of_year', 'is_weekend', 'days_since_epoch',
+                        'days_from_today', 'is_recent']:
+            column = f'purchase_date_{feature}'
+            assert result[column].tolist() == expected[column].tolist()
+        assert result['purchase_date_season'].astype(str).tolist() == expected['purchase_date_season'].astype(str).tolist()
+
+    def test_polars_text_dates_parse_like_pandas(self):
+        pl = pytest.importorskip('polars')
+        from src.polars_pipeline import time_based_feature_extraction as polars_time_features
+        frame = pl.DataFrame({'purchase_date': ['06/03/2025', '07/19/2025', None],
+                              'signup_date': ['06/03/2025', 'unknown', None]})
+        result = polars_time_features(frame.lazy()).collect()
+        expected = pd.to_datetime(pd.Series(['06/03/2025', '07/19/2025']))
+        assert result['purchase_date'].to_list() == expected.tolist() + [None]
+        assert result['signup_date'].dtype == pl.String
+        assert 'signup_date_year' not in result.columns
+
+    def test_polars_engine_skips_non_date_columns(self, sample_df):
+        pytest.importorskip('polars')
+        sample_df['time_spent'] = [1.5, 2.0, 3.5, 0.5, 4.0]
+        sample_df['timezone'] = ['UTC', 'PST', 'UTC', 'EST', 'CET']
+        result = time_based_feature_extraction(sample_df, engine='polars')
+        assert 'purchase_date_year' in result.columns
+        assert 'time_spent_year' not in result.columns
+        assert 'timezone_year' not in result.columns
+
+    @pytest.mark.parametrize('layout', ['%m/%d/%Y', '%d %B %Y'])
+    def test_polars_engine_matches_pandas_text_dates(self, sample_df, layout):
+        pytest.importorskip('polars')
+        sample_df['purchase_date'] = sample_df['purchase_date'].dt.strftime(layout)
+        expected = time_based_feature_extraction(sample_df)
+        result = time_based_feature_extraction(sample_df, engine='polars')
+        assert result.columns.tolist() == expected.columns.tolist()
+        assert result['purchase_date'].tolist() == expected['purchase_date'].tolist()
+        for feature in ['year', 'month', 'day', 'days_since_epoch']:
+            column = f'purchase_date_{feature}'
+            assert result[column].tolist() == expected[column].tolist()
+
+    def test_days_from_today_shared_across_columns(self, sample_df):
+        sample_df['delivery_date'] = sample_df['purchase_date']
+        result = time_based_feature_extraction(sample_df)
+        assert (result['purchase_date_days_from_today'] == result['delivery_date_days_from_today']).all()
+
+    @pytest.mark.parametrize('suffix', ['parquet', 'feather'])
+    def test_process_csv_binary_roundtrip(self, sample_df, tmp_path, suffix):
+        from src.time_based_feature_extraction import process_csv
+        from src._io import read_table
+        output_file = str(tmp_path / f'time_features.{suffix}')
+        result = process_csv(sample_df, output_file, verbose=False)
+        loaded = read_table(output_file)
+        assert loaded.columns.tolist() == result.columns.tolist()
+        assert loaded['purchase_date_season'].dtype == result['purchase_date_season'].dtype
+        assert loaded['purchase_date_year'].tolist() == result['purchase_date_year'].tolist()
+
     def test_year_values_reasonable(self, sample_df):
         result = time_based_feature_extraction(sample_df)
         assert all(result['purchase_date_year'].between(2020, 2030))
@@ -195,11 +443,51 @@ class TestFlagAnomaliesColumn:
         result = flag_anomalies_column(sample_df)
         assert (result['anomaly_score'] >= 0).all()
 
+    def test_numba_and_numpy_paths_agree(self, sample_df, monkeypatch):
+        module = sys.modules['src.flag_anomalies_column']
+        result = flag_anomalies_column(sample_df)
+        monkeypatch.setattr(module, 'NUMBA_AVAILABLE', False)
+        fallback = flag_anomalies_column(sample_df)
+        flag_cols = [col for col in result.columns if 'anomaly' in col]
+        assert (result[flag_cols].to_numpy() == fallback[flag_cols].to_numpy()).all()
+
+    def test_combined_flag_is_union(self, sample_df):
+        result = flag_anomalies_column(sample_df)
+        combined = result['income_anomaly_zscore'] | result['income_anomaly_iqr']
+        assert (result['income_is_anomaly'] == combined).all()
+        assert result['income_is_anomaly'].dtype == np.int8
+
+    def test_verbose_false_is_silent(self, sample_df, capsys):
+        flag_anomalies_column(sample_df, verbose=False)
+        assert capsys.readouterr().out == ''
+
     def test_no_rows_lost(self, sample_df):
         result = flag_anomalies_column(sample_df)
         assert len(result) == len(sample_df)
 
 
+class TestDowncast:
+    def test_integers_narrowed(self, sample_df):
+        from src._dtypes import downcast
+        result = downcast(sample_df)
+        assert result['age'].dtype == np.int8
+        assert result['income'].dtype == np.int32
+
+    def test_floats_narrowed_only_when_lossless(self):
+        from src._dtypes import downcast
+        df = pd.DataFrame({'whole': [5.0, 10.0], 'price': [12.34, 99.99]})
+        result = downcast(df)
+        assert result['whole'].dtype == np.float32
+        assert result['price'].dtype == np.float64
+
+    def test_derived_columns_unchanged_after_downcast(self, sample_df):
+        from src._dtypes import downcast
+        result = derive_computed_columns(downcast(sample_df))
+        expected = derive_computed_columns(sample_df)
+        assert (result['age_squared'] == expected['age_squared']).all()
+        assert np.allclose(result['final_price'], expected['final_price'])
+
+
 class TestFullPipeline:
     def test_pipeline_increases_columns(self, sample_df):
         df = derive_computed_columns(sample_df)
@@ -217,6 +505,14 @@ class TestFullPipeline:
         df = flag_anomalies_column(df)
         assert len(df) == len(sample_df)
 
+    def test_pipeline_does_not_modify_input(self, sample_df):
+        original_columns = sample_df.columns.tolist()
+        df = derive_computed_columns(sample_df)
+        df = encode_categorical_features(df)
+        df = bin_numeric_ranges(df)
+        df = flag_anomalies_column(df)
+        assert sample_df.columns.tolist() == original_columns
+
     def test_pipeline_output_has_no_extra_nulls(self, sample_df):
         df = derive_computed_columns(sample_df)
         df = encode_categorical_features(df)
@@ -228,4 +524,43 @@ class TestFullPipeline:
         tiny_df.to_csv("input/test_detect.csv", index=False)
         files = [f for f in os.listdir("input") if f.endswith('.csv')]
         assert len(files) >= 1
-        os.remove("input/test_detect.csv")
\ No newline at end of file
+        os.remove("input/test_detect.csv")
+
+    def test_parallel_pipeline_exits(self, sample_df, tmp_path):
+        import subprocess
+        csv_path, output_path = tmp_path / 'sample.csv', tmp_path / 'final.csv'
+        sample_df.to_csv(csv_path, index=False)
+        root = os.path.join(os.path.dirname(__file__), '..')
+        code = (f"import main; main.run_pipeline(input_csv={str(csv_path)!r}, "
+                f"output_csv={str(output_path)!r}, parallel=True)")
+        completed = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, timeout=60)
+        assert completed.returncode == 0
+        assert output_path.exists()
+
+    def test_polars_engine_matches_pandas_columns(self, sample_df, tmp_path):
+        pytest.importorskip('polars')
+        from src.polars_pipeline import run_pipeline as polars_pipeline
+        csv_path = tmp_path / 'sample.csv'
+        sample_df.to_csv(csv_path, index=False)
+        df = derive_computed_columns(sample_df)
+        df = encode_categorical_features(df)
+        df = bin_numeric_ranges(df)
+        df = time_based_feature_extraction(df)
+        df = flag_anomalies_column(df)
+        result = polars_pipeline(str(csv_path))
+        assert result.columns == df.columns.tolist()
+        assert result['income_is_anomaly'].to_list() == df['income_is_anomaly'].tolist()
+
+    def test_polars_engine_matches_pandas_columns_text_dates(self, sample_df, tmp_path):
+        pytest.importorskip('polars')
+        from src.polars_pipeline import run_pipeline as polars_pipeline
+        csv_path = tmp_path / 'sample.csv'
+        sample_df.assign(purchase_date=sample_df['purchase_date'].dt.strftime('%m/%d/%Y')).to_csv(csv_path, index=False)
+        df = derive_computed_columns(pd.read_csv(csv_path))
+        df = encode_categorical_features(df)
+        df = bin_numeric_ranges(df)
+        df = time_based_feature_extraction(df)
+        df = flag_anomalies_column(df)
+        result = polars_pipeline(str(csv_path))
+        assert 'purchase_date_freq' not in result.columns
+        assert result.columns == df.columns.tolist()